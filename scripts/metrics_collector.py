@@ -7,7 +7,20 @@ import os
 import json
 import subprocess
 from datetime import datetime, timedelta
-from pathlib import Path
+try:
+    import orjson
+    
+    def _dumps(obj):
+        # Indented: .metrics_cache.json is committed alongside the README
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    
+    _loads = json.loads
 
 # Configuration
 PROJECTS_DIR = os.path.expanduser("~/PROJECTS_all")
@@ -15,6 +28,16 @@ MONITOR_STATE_FILE = ".project_monitor_state.json"
 METRICS_CACHE_FILE = ".metrics_cache.json"
 METRICS_SUMMARY_FILE = ".metrics_summary.txt"
 
+# Directories skipped by the repository walk, besides hidden ones
+SKIP_DIRS = ('node_modules', '__pycache__')
+
+# Hidden directories that are still walked, only to classify workflow files
+TRACKED_HIDDEN_DIRS = ('.github', '.github/workflows')
+
+# File suffixes counted as workflows and scripts
+WORKFLOW_SUFFIXES = ('.yml', '.yml.disabled')
+SCRIPT_SUFFIXES = ('.py', '.sh')
+
 def log(message):
     """Print timestamped log message"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -39,35 +62,74 @@ def get_recent_git_activity():
         since = datetime.now() - timedelta(days=1)
         since_str = since.strftime('%Y-%m-%d')
         
+        # Let git do the counting instead of listing and splitting commits
         result = subprocess.run(
-            ['git', 'log', '--since', since_str, '--oneline'],
+            ['git', 'rev-list', '--count', '--since', since_str, 'HEAD'],
             capture_output=True,
             text=True,
             timeout=5
         )
         
         if result.returncode == 0:
-            commits = result.stdout.strip().split('\n')
-            return len([c for c in commits if c])
+            return int(result.stdout.strip() or 0)
         
     except Exception as e:
         log(f"Error getting git activity: {e}")
     
     return 0
 
-def get_file_count(directory="."):
-    """Count files in directory recursively"""
+def collect_all_stats(root="."):
+    """Count files, bytes, workflows and scripts in a single directory walk"""
+    stats = {
+        'files': 0,
+        'bytes': 0,
+        'workflows_yml': 0,
+        'workflows_disabled': 0,
+        'py_scripts': 0,
+        'sh_scripts': 0,
+        'has_workflows_dir': False,
+        'has_scripts_dir': False
+    }
+    
     try:
-        count = 0
-        for root, dirs, files in os.walk(directory):
-            # Skip hidden directories and common exclusions
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__']]
-            # Count non-hidden files
-            count += len([f for f in files if not f.startswith('.')])
-        return count
+        stack = [(root, '')]
+        while stack:
+            directory, rel = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            
+            hidden = rel.startswith('.')
+            in_workflows = rel == '.github/workflows'
+            in_scripts = rel == 'scripts'
+            stats['has_workflows_dir'] |= in_workflows
+            stats['has_scripts_dir'] |= in_scripts
+            
+            with it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        child = f"{rel}/{name}" if rel else name
+                        if child in TRACKED_HIDDEN_DIRS or not (
+                                hidden or name.startswith('.') or name in SKIP_DIRS):
+                            stack.append((entry.path, child))
+                    elif entry.is_file(follow_symlinks=False):
+                        if in_workflows and name.endswith(WORKFLOW_SUFFIXES):
+                            stats['workflows_yml' if name.endswith('.yml') else 'workflows_disabled'] += 1
+                        
+                        # Only non-hidden files count towards totals
+                        if hidden or name.startswith('.'):
+                            continue
+                        stats['files'] += 1
+                        stats['bytes'] += entry.stat(follow_symlinks=False).st_size
+                        
+                        if in_scripts and name.endswith(SCRIPT_SUFFIXES):
+                            stats['py_scripts' if name.endswith('.py') else 'sh_scripts'] += 1
     except Exception as e:
-        log(f"Error counting files: {e}")
-        return 0
+        log(f"Error scanning repository: {e}")
+    
+    return stats
 
 def get_workflow_runs_from_api():
     """Get workflow run data from GitHub API (if token available)"""
@@ -90,8 +152,8 @@ def analyze_monitor_state():
     
     if os.path.exists(MONITOR_STATE_FILE):
         try:
-            with open(MONITOR_STATE_FILE, 'r') as f:
-                state = json.load(f)
+            with open(MONITOR_STATE_FILE, 'rb') as f:
+                state = _loads(f.read())
             
             metrics['projects_monitored'] = len(state)
             
@@ -111,41 +173,24 @@ def analyze_monitor_state():
     
     return metrics
 
-def collect_repository_stats():
+def collect_repository_stats(all_stats):
     """Collect statistics about the current repository"""
     stats = {}
     
     # Count workflow files
-    workflow_dir = Path(".github/workflows")
-    if workflow_dir.exists():
-        yml_files = list(workflow_dir.glob("*.yml"))
-        disabled_files = list(workflow_dir.glob("*.yml.disabled"))
-        stats['workflow_count'] = len(yml_files) + len(disabled_files)
-        stats['active_workflows'] = len(yml_files)
-        stats['disabled_workflows'] = len(disabled_files)
+    if all_stats['has_workflows_dir']:
+        stats['workflow_count'] = all_stats['workflows_yml'] + all_stats['workflows_disabled']
+        stats['active_workflows'] = all_stats['workflows_yml']
+        stats['disabled_workflows'] = all_stats['workflows_disabled']
     
     # Count scripts
-    scripts_dir = Path("scripts")
-    if scripts_dir.exists():
-        py_files = list(scripts_dir.glob("*.py"))
-        sh_files = list(scripts_dir.glob("*.sh"))
-        stats['python_scripts'] = len(py_files)
-        stats['shell_scripts'] = len(sh_files)
-        stats['total_scripts'] = len(py_files) + len(sh_files)
+    if all_stats['has_scripts_dir']:
+        stats['python_scripts'] = all_stats['py_scripts']
+        stats['shell_scripts'] = all_stats['sh_scripts']
+        stats['total_scripts'] = all_stats['py_scripts'] + all_stats['sh_scripts']
     
     # Repository size (rough estimate)
-    try:
-        result = subprocess.run(
-            ['du', '-sh', '.'],
-            capture_output=True,
-            text=True,
-            cwd='.'
-        )
-        if result.returncode == 0:
-            size = result.stdout.split()[0]
-            stats['repo_size'] = size
-    except:
-        stats['repo_size'] = 'Unknown'
+    stats['repo_size'] = f"{all_stats['bytes'] / 1024 / 1024:.1f}M"
     
     return stats
 
@@ -194,9 +239,10 @@ def main():
     log("Analyzing git activity...")
     metrics['recent_commits'] = get_recent_git_activity()
     
-    # Collect file count
-    log("Counting repository files...")
-    metrics['total_files'] = get_file_count()
+    # Walk the repository once for file, workflow and script counts
+    log("Scanning repository files...")
+    all_stats = collect_all_stats()
+    metrics['total_files'] = all_stats['files']
     
     # Analyze monitor state if available
     log("Analyzing monitor state...")
@@ -205,7 +251,7 @@ def main():
     
     # Collect repository statistics
     log("Collecting repository statistics...")
-    metrics['repository_stats'] = collect_repository_stats()
+    metrics['repository_stats'] = collect_repository_stats(all_stats)
     
     # Add timestamp
     metrics['timestamp'] = datetime.now().isoformat()
@@ -214,8 +260,8 @@ def main():
     # Save metrics cache
     log(f"Saving metrics to {METRICS_CACHE_FILE}...")
     try:
-        with open(METRICS_CACHE_FILE, 'w') as f:
-            json.dump(metrics, f, indent=2)
+        with open(METRICS_CACHE_FILE, 'wb') as f:
+            f.write(_dumps(metrics))
         log("Metrics saved successfully")
     except Exception as e:
         log(f"Error saving metrics: {e}")
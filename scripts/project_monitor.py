@@ -6,12 +6,40 @@ and updates corresponding markdown files in the Obsidian vault.
 """
 
 import os
+import re
 import json
 import time
-from datetime import datetime
-from pathlib import Path
-import subprocess
+import heapq
+import asyncio
+from typing import NamedTuple
 import hashlib
+import struct
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import xxhash
+    
+    def _new_hash():
+        return xxhash.xxh3_64()
+except ImportError:
+    # Change detection only needs a fast non-cryptographic digest
+    def _new_hash():
+        return hashlib.blake2b(digest_size=8)
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+    
+    _loads = json.loads
 
 # Configuration
 PROJECTS_DIR = os.path.expanduser("~/PROJECTS_all")
@@ -19,6 +47,18 @@ OBSIDIAN_DIR = "/Users/lech/Library/Mobile Documents/iCloud~md~obsidian/Document
 STATE_FILE = os.path.join(OBSIDIAN_DIR, ".project_monitor_state.json")
 LOG_FILE = os.path.join(OBSIDIAN_DIR, ".project_monitor.log")
 
+# Maximum seconds to spend scanning a single project
+SCAN_TIMEOUT = 30
+
+# Maximum number of projects processed concurrently
+MAX_WORKERS = 16
+
+# Seconds since the last full walk during which a matching tree signature
+# is trusted. One hour, plus a scan's worth of slack so a run that starts a
+# little late still lands inside it. This only helps local runs: CI checks
+# out a fresh copy each time, so the top-level mtimes never match there.
+SKIP_WINDOW = 3600 + SCAN_TIMEOUT
+
 # Directories to exclude from monitoring
 EXCLUDE_DIRS = {
     '.git', 'node_modules', '__pycache__', '.next', 'dist', 
@@ -31,20 +71,68 @@ EXCLUDE_EXTENSIONS = {
     '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib',
     '.log', '.pid', '.lock', '.tmp', '.swp', '.swo'
 }
+_EXCLUDE_SUFFIXES = tuple(EXCLUDE_EXTENSIONS)
+
+# Matches an existing Recent Activity section up to its "*Last scan:" line,
+# the next top-level heading, or the end of the file
+_RECENT_RE = re.compile(
+    rb'^## Recent Activity\b.*?(?:^\*Last scan:[^\n]*|(?=\n#{1,2} )|\Z)',
+    re.MULTILINE | re.DOTALL
+)
+
+# Header of the generated Recent Activity table
+_MD_HEADER = (
+    "## Recent Activity (Last 20 Edits)\n\n"
+    "| Date & Time | File | Size |\n"
+    "|-------------|------|------|\n"
+)
+
+class Mod(NamedTuple):
+    """A single file modification record."""
+    path: str
+    timestamp: float
+    size: int
+
+def _format_timestamp(timestamp):
+    """Format an mtime the way it is shown in markdown and the state file."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+def _mod_to_dict(mod):
+    """Convert a Mod into its persisted JSON form."""
+    return {
+        'path': mod.path,
+        'timestamp': mod.timestamp,
+        'datetime': _format_timestamp(mod.timestamp),
+        'size': mod.size
+    }
+
+_log_fd = None
 
 def log_message(message):
     """Write a timestamped message to the log file."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, 'a') as f:
-        f.write(f"[{timestamp}] {message}\n")
-    print(f"[{timestamp}] {message}")
+    global _log_fd
+    # Opened on first use (from main, before any worker threads start);
+    # O_APPEND makes each single write atomic, so workers need no lock.
+    if _log_fd is None:
+        _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    line = f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n"
+    os.write(_log_fd, line.encode())
+    print(line, end='')
 
 def load_state():
     """Load the previous state from the state file."""
     if os.path.exists(STATE_FILE):
         try:
-            with open(STATE_FILE, 'r') as f:
-                return json.load(f)
+            with open(STATE_FILE, 'rb') as f:
+                state = _loads(f.read())
+            
+            # Keep modification records as flat tuples in memory
+            for record in state.values():
+                record['modifications'] = [
+                    Mod(m['path'], m['timestamp'], m['size'])
+                    for m in record.get('modifications', [])
+                ]
+            return state
         except Exception as e:
             log_message(f"Error loading state: {e}")
     return {}
@@ -52,106 +140,172 @@ def load_state():
 def save_state(state):
     """Save the current state to the state file."""
     try:
-        with open(STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
+        serializable = {
+            name: {**record, 'modifications': [_mod_to_dict(m) for m in record.get('modifications', [])]}
+            for name, record in state.items()
+        }
+        with open(STATE_FILE, 'wb') as f:
+            f.write(_dumps(serializable))
     except Exception as e:
         log_message(f"Error saving state: {e}")
 
-def should_exclude_path(path):
-    """Check if a path should be excluded from monitoring."""
-    path_parts = Path(path).parts
-    
-    # Check if any part of the path is in exclude dirs
-    for part in path_parts:
-        if part in EXCLUDE_DIRS:
-            return True
-    
-    # Check file extension
-    ext = os.path.splitext(path)[1]
-    if ext in EXCLUDE_EXTENSIONS:
-        return True
-    
-    return False
+def _iter_files(root):
+    """Yield (mtime, size, relative_path) for every monitored file under root.
+
+    Walks the tree iteratively with os.scandir, pruning excluded and hidden
+    directories as it goes so their contents are never listed. Each directory
+    carries its path relative to root, so relative file paths are built by
+    concatenation rather than os.path.relpath.
+    """
+    deadline = time.monotonic() + SCAN_TIMEOUT
+    stack = [(root, '')]
+    while stack:
+        if time.monotonic() > deadline:
+            raise TimeoutError(root)
+        directory, prefix = stack.pop()
+        # A single handler per directory covers both an unreadable directory
+        # and a file removed between readdir and stat; the hot loop stays
+        # free of per-entry exception setup.
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue  # Exclude hidden files/dirs
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in EXCLUDE_DIRS:
+                            stack.append((entry.path, prefix + name + os.sep))
+                    elif entry.is_file(follow_symlinks=False):
+                        if name.endswith(_EXCLUDE_SUFFIXES):
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        yield stat.st_mtime, stat.st_size, prefix + name
+        except OSError:
+            continue
 
 def get_file_modifications(project_path, limit=20):
     """Get the last N modified files in a project directory."""
     modifications = []
     
     try:
-        # Use find command for efficiency
-        cmd = [
-            'find', project_path,
-            '-type', 'f',
-            '-not', '-path', '*/.*',  # Exclude hidden files/dirs
-        ]
-        
-        # Add exclusions
-        for exclude_dir in EXCLUDE_DIRS:
-            cmd.extend(['-not', '-path', f'*/{exclude_dir}/*'])
-        
-        # Execute find command
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        # Keep a min-heap of the newest `limit` files seen so far; the
+        # oldest of them sits at heap[0] and is evicted by anything newer.
+        heap = []
+        for item in _iter_files(project_path):
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
         
-        if result.returncode == 0:
-            files = result.stdout.strip().split('\n')
-            files = [f for f in files if f and not should_exclude_path(f)]
+        heap.sort(reverse=True)
+        for mtime, size, relative_path in heap:
+            modifications.append(Mod(relative_path, mtime, size))
             
-            # Get modification times for each file
-            for file_path in files:
-                try:
-                    stat = os.stat(file_path)
-                    mtime = stat.st_mtime
-                    relative_path = os.path.relpath(file_path, project_path)
-                    modifications.append({
-                        'path': relative_path,
-                        'timestamp': mtime,
-                        'datetime': datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S"),
-                        'size': stat.st_size
-                    })
-                except:
-                    continue
-            
-            # Sort by timestamp (newest first) and limit
-            modifications.sort(key=lambda x: x['timestamp'], reverse=True)
-            modifications = modifications[:limit]
-            
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         log_message(f"Timeout scanning project: {project_path}")
     except Exception as e:
         log_message(f"Error scanning project {project_path}: {e}")
     
     return modifications
 
+def get_tree_signature(project_path):
+    """Hash the mtimes of a project root and its top-level entries.
+    
+    A directory's mtime ticks whenever a child is added, removed or renamed,
+    so one scandir sweep covers changes in the first two levels of the tree.
+    """
+    h = _new_hash()
+    h.update(repr(os.stat(project_path).st_mtime).encode())
+    with os.scandir(project_path) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            name = entry.name
+            if name.startswith('.') or name in EXCLUDE_DIRS:
+                continue
+            h.update(f"{name}\0{entry.stat(follow_symlinks=False).st_mtime!r}\0".encode('utf-8', 'surrogateescape'))
+    return h.hexdigest()
+
 def calculate_project_hash(modifications):
     """Calculate a hash of the project's modification state."""
     if not modifications:
         return ""
     
-    # Create a string representation of the top modifications
-    state_string = json.dumps(modifications[:5], sort_keys=True)
-    return hashlib.md5(state_string.encode()).hexdigest()
+    # Pack the top modifications directly instead of going through JSON
+    h = _new_hash()
+    for mod in modifications[:5]:
+        h.update(struct.pack('<dQ', mod.timestamp, mod.size))
+        h.update(os.fsencode(mod.path))
+    return h.hexdigest()
+
+def _format_size(size):
+    """Format a byte count as KB/MB with one decimal, using integer arithmetic."""
+    shift, unit = (10, 'KB') if size < 1 << 20 else (20, 'MB')
+    tenths = (size * 10) >> shift
+    remainder = (size * 10) & ((1 << shift) - 1)
+    # Round half to even, matching the float formatting this replaces
+    half = 1 << (shift - 1)
+    if remainder > half or (remainder == half and tenths & 1):
+        tenths += 1
+    return f"{tenths // 10}.{tenths % 10}{unit}"
+
+def _fmt_row(mod):
+    """Format a single modification as a markdown table row."""
+    # Truncate long paths
+    path = mod.path
+    if len(path) > 60:
+        path = "..." + path[-57:]
+    return f"| {_format_timestamp(mod.timestamp)} | `{path}` | {_format_size(mod.size)} |"
 
 def format_modifications_for_markdown(modifications):
     """Format the modifications list for insertion into markdown."""
     if not modifications:
         return "No recent modifications found."
     
-    lines = ["## Recent Activity (Last 20 Edits)\n"]
-    lines.append("| Date & Time | File | Size |")
-    lines.append("|-------------|------|------|")
+    return (_MD_HEADER
+            + "\n".join(_fmt_row(mod) for mod in modifications)
+            + f"\n\n*Last scan: {time.strftime('%Y-%m-%d %H:%M:%S')}*")
+
+def _bypass_page_cache(fd):
+    """Ask macOS not to cache pages for fd; call before reading or writing."""
+    if fcntl is not None and hasattr(fcntl, 'F_NOCACHE'):
+        try:
+            fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+        except OSError:
+            pass
+
+def _drop_page_cache(fd):
+    """Tell Linux the pages for fd will not be needed again; call when done."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def _section_body(section):
+    """Strip the always-changing "*Last scan:" footer from a rendered section."""
+    idx = section.rfind(b"*Last scan:")
+    return (section[:idx] if idx != -1 else section).strip()
+
+def _splice_activity_section(content, activity_section):
+    """Return content bytes with the activity section replaced or inserted.
     
-    for mod in modifications:
-        size_kb = mod['size'] / 1024
-        size_str = f"{size_kb:.1f}KB" if size_kb < 1024 else f"{size_kb/1024:.1f}MB"
-        # Truncate long paths
-        path = mod['path']
-        if len(path) > 60:
-            path = "..." + path[-57:]
-        lines.append(f"| {mod['datetime']} | `{path}` | {size_str} |")
+    Returns None if the existing section already shows the same table.
+    """
+    # Replace the existing Recent Activity section in a single pass
+    match = _RECENT_RE.search(content)
+    if match:
+        if _section_body(match.group(0)) == _section_body(activity_section):
+            return None
+        return b''.join((content[:match.start()], activity_section, content[match.end():]))
     
-    lines.append(f"\n*Last scan: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
+    # Add new section before Context or at the end
+    idx = content.find(b"## Context")
+    if idx != -1:
+        return b''.join((content[:idx], activity_section, b"\n\n", content[idx:]))
     
-    return "\n".join(lines)
+    # Add at the end
+    if content and not content.endswith(b'\n'):
+        content += b'\n'
+    return content + b'\n' + activity_section
 
 def update_markdown_file(project_name, modifications):
     """Update the project's markdown file with modification history."""
@@ -162,62 +316,29 @@ def update_markdown_file(project_name, modifications):
         return False
     
     try:
-        # Read current content
-        with open(md_file, 'r') as f:
+        # Format new activity section
+        activity_section = format_modifications_for_markdown(modifications).encode()
+        
+        # Read as bytes, not mmap: the synced vault can truncate the file under
+        # us, which would SIGBUS a mapping. Keep it from evicting pages of
+        # files the user is actively editing
+        with open(md_file, 'rb') as f:
+            _bypass_page_cache(f.fileno())
             content = f.read()
+            _drop_page_cache(f.fileno())
         
-        # Format new activity section
-        activity_section = format_modifications_for_markdown(modifications)
+        new_content = _splice_activity_section(content, activity_section)
         
-        # Check if Recent Activity section exists
-        if "## Recent Activity" in content:
-            # Replace existing section
-            # Find the section and replace it
-            start_marker = "## Recent Activity"
-            end_markers = ["\n## ", "\n# ", "\n---", "\n*Last scan:"]
-            
-            start_idx = content.find(start_marker)
-            if start_idx != -1:
-                # Find where this section ends
-                remaining = content[start_idx:]
-                end_idx = len(content)
-                
-                # Look for the next section
-                for marker in ["\n## ", "\n# "]:
-                    idx = remaining.find(marker, 1)  # Skip the first char to avoid matching current section
-                    if idx != -1:
-                        end_idx = start_idx + idx
-                        break
-                
-                # Also check for last scan line
-                last_scan_idx = remaining.find("\n*Last scan:")
-                if last_scan_idx != -1:
-                    # Find the end of this line
-                    line_end = remaining.find("\n", last_scan_idx + 1)
-                    if line_end != -1:
-                        potential_end = start_idx + line_end + 1
-                        if potential_end < end_idx:
-                            end_idx = potential_end
-                
-                # Replace the section
-                new_content = content[:start_idx] + activity_section
-                if end_idx < len(content):
-                    new_content += content[end_idx:]
-                content = new_content
-        else:
-            # Add new section before Context or at the end
-            if "## Context" in content:
-                idx = content.find("## Context")
-                content = content[:idx] + activity_section + "\n\n" + content[idx:]
-            else:
-                # Add at the end
-                if not content.endswith('\n'):
-                    content += '\n'
-                content += '\n' + activity_section
+        # Leave the file untouched (no iCloud sync churn) if nothing visible changed
+        if new_content is None:
+            return True
         
         # Write updated content
-        with open(md_file, 'w') as f:
-            f.write(content)
+        with open(md_file, 'wb') as f:
+            _bypass_page_cache(f.fileno())
+            f.write(new_content)
+            f.flush()
+            _drop_page_cache(f.fileno())
         
         return True
         
@@ -229,6 +350,23 @@ def process_project(project_name, project_path, previous_state):
     """Process a single project directory."""
     log_message(f"Processing {project_name}...")
     
+    previous = previous_state.get(project_name, {})
+    
+    # Skip the full walk if the top of the tree is untouched since a recent walk
+    try:
+        tree_signature = get_tree_signature(project_path)
+    except OSError:
+        tree_signature = ''
+    
+    now = time.time()
+    if (tree_signature and tree_signature == previous.get('tree_signature')
+            and previous.get('last_scanned', 0) > now - SKIP_WINDOW
+            and previous.get('modifications')):
+        log_message(f"  No changes detected in {project_name} (tree unchanged)")
+        record = {k: v for k, v in previous.items() if k != 'last_updated'}
+        record['last_checked'] = now
+        return record
+    
     # Get current modifications
     modifications = get_file_modifications(project_path)
     
@@ -240,13 +378,15 @@ def process_project(project_name, project_path, previous_state):
     current_hash = calculate_project_hash(modifications)
     
     # Check if project has changed
-    previous_hash = previous_state.get(project_name, {}).get('hash', '')
+    previous_hash = previous.get('hash', '')
     
     if current_hash == previous_hash:
         log_message(f"  No changes detected in {project_name}")
         return {
             'hash': current_hash,
-            'last_checked': time.time(),
+            'tree_signature': tree_signature,
+            'last_checked': now,
+            'last_scanned': now,
             'modifications': modifications
         }
     
@@ -259,11 +399,31 @@ def process_project(project_name, project_path, previous_state):
     
     return {
         'hash': current_hash,
-        'last_checked': time.time(),
+        'tree_signature': tree_signature,
+        'last_checked': now,
+        'last_scanned': now,
         'last_updated': time.time(),
         'modifications': modifications
     }
 
+async def process_project_async(project_name, project_path, previous_state, semaphore):
+    """Process a project on a worker thread, bounded by the shared semaphore."""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, process_project, project_name, project_path, previous_state
+        )
+
+async def process_all_projects(projects, previous_state):
+    """Process all projects concurrently; results are in project order."""
+    # Cap concurrent scans so the vault filesystem is not thrashed
+    semaphore = asyncio.Semaphore(MAX_WORKERS)
+    return await asyncio.gather(*(
+        process_project_async(project_name, os.path.join(PROJECTS_DIR, project_name),
+                              previous_state, semaphore)
+        for project_name in projects
+    ))
+
 def main():
     """Main monitoring function."""
     log_message("=" * 60)
@@ -282,12 +442,11 @@ def main():
         
         log_message(f"Found {len(projects)} projects to monitor")
         
-        # Process each project
+        # Process projects concurrently; the work is dominated by filesystem IO
         updated_count = 0
-        for project_name in projects:
-            project_path = os.path.join(PROJECTS_DIR, project_name)
-            result = process_project(project_name, project_path, state)
-            
+        results = asyncio.run(process_all_projects(projects, state))
+        
+        for project_name, result in zip(projects, results):
             if result:
                 new_state[project_name] = result
                 if 'last_updated' in result:
@@ -7,34 +7,84 @@ import os
 import json
 import subprocess
 import re
+import tempfile
 from datetime import datetime
 from pathlib import Path
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    
+    _loads = json.loads
 
 # Configuration
 README_PATH = "README.md"
 WORKFLOW_STATE_FILE = ".workflow_state.json"
 METRICS_CACHE_FILE = ".metrics_cache.json"
 
+# Sections and the heading each one's markers are inserted before when missing
+MARKER_ANCHORS = (
+    ("BADGES", "## 🎯 Purpose"),
+    ("STATUS", "## 🚀 Active Workflows"),
+    ("METRICS", "## 📊 Monitoring Dashboard"),
+    ("ACTIVITY", "## 🔄 Workflow Status"),
+)
+
+# Precompiled pattern for README section markers
+_MARKER_RE = re.compile(r'<!-- AUTO-GENERATED:(\w+):(START|END) -->')
+
+# The "updated" badge timestamp and the footer line
+_TIMESTAMPS_RE = re.compile(r'(?<=badge/updated-)[^)]*?(?=-blue)|\*Last automated update:[^*]*\*')
+
 def log(message):
     """Print timestamped log message"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
+def write_file_atomic(path, data):
+    """Write bytes to path via a temp file and rename, so readers never see a partial file"""
+    path = os.fspath(path)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
 def load_json_file(filepath):
     """Load JSON file safely"""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            log(f"Error loading {filepath}: {e}")
+    try:
+        with open(filepath, 'rb') as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log(f"Error loading {filepath}: {e}")
     return {}
 
 def save_json_file(filepath, data):
     """Save JSON file safely"""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(_dumps(data))
         return True
     except Exception as e:
         log(f"Error saving {filepath}: {e}")
@@ -43,8 +93,9 @@ def save_json_file(filepath, data):
 def get_recent_commits(limit=10):
     """Get recent Git commits"""
     try:
+        # NUL-separate fields and records so '|' in commit messages is harmless
         result = subprocess.run(
-            ['git', 'log', '--oneline', f'-{limit}', '--pretty=format:%h|%s|%ar|%an'],
+            ['git', 'log', '-z', f'-{limit}', '--pretty=format:%h%x00%s%x00%ar%x00%an'],
             capture_output=True,
             text=True,
             timeout=5
@@ -52,22 +103,20 @@ def get_recent_commits(limit=10):
         
         commits = []
         if result.returncode == 0 and result.stdout:
-            for line in result.stdout.strip().split('\n'):
-                if '|' in line:
-                    parts = line.split('|')
-                    if len(parts) >= 4:
-                        commits.append({
-                            'hash': parts[0],
-                            'message': parts[1][:50],  # Truncate long messages
-                            'time_ago': parts[2],
-                            'author': parts[3]
-                        })
+            fields = result.stdout.rstrip('\0').split('\0')
+            for i in range(0, len(fields) - 3, 4):
+                commits.append({
+                    'hash': fields[i],
+                    'message': fields[i + 1][:50],  # Truncate long messages
+                    'time_ago': fields[i + 2],
+                    'author': fields[i + 3]
+                })
         return commits
     except Exception as e:
         log(f"Error getting commits: {e}")
         return []
 
-def generate_badges(workflow_data, metrics_data):
+def generate_badges(workflow_data, metrics_data, now=None):
     """Generate status badges"""
     active_count = sum(1 for w in workflow_data.get('workflows', []) if w.get('enabled'))
     total_count = len(workflow_data.get('workflows', []))
@@ -85,7 +134,7 @@ def generate_badges(workflow_data, metrics_data):
         status_color = "yellow"
         status_text = f"{active_count}%2F{total_count}_active"  # URL encode "/"
     
-    update_time = datetime.now().strftime("%Y--%m--%d_%H:%M")
+    update_time = (now or datetime.now()).strftime("%Y--%m--%d_%H:%M")
     
     badges = [
         f"![Workflow Status](https://img.shields.io/badge/workflows-{status_text}-{status_color}?style=for-the-badge)",
@@ -112,9 +161,11 @@ def generate_workflow_table(workflow_data):
     if not workflows:
         return "No workflows found in `.github/workflows/`"
     
-    lines = []
-    lines.append("| Workflow | Status | Schedule | Last Run | Success Rate | Actions |")
-    lines.append("|----------|--------|----------|----------|--------------|---------|")
+    lines = [
+        "| Workflow | Status | Schedule | Last Run | Success Rate | Actions |",
+        "|----------|--------|----------|----------|--------------|---------|"
+    ]
+    disabled_count = 0
     
     for workflow in workflows:
         name = workflow.get('name', 'Unknown')
@@ -124,6 +175,7 @@ def generate_workflow_table(workflow_data):
             status = "🟢 Active"
             actions = f"[View Runs](../../actions/workflows/{workflow.get('filename', '')})"
         else:
+            disabled_count += 1
             status = "🔴 Disabled"
             actions = f"[Enable](.github/workflows/{workflow.get('filename', '')})"
         
@@ -141,7 +193,6 @@ def generate_workflow_table(workflow_data):
         lines.append(f"| **{name}** | {status} | {schedule} | {last_run} | {success_rate} | {actions} |")
     
     # Add attention section if workflows are disabled
-    disabled_count = sum(1 for w in workflows if not w.get('enabled'))
     if disabled_count > 0:
         lines.append("")
         lines.append("### ⚠️ Attention Required")
@@ -188,36 +239,56 @@ def generate_recent_activity(limit=5):
     
     return '\n'.join(lines)
 
-def update_readme_section(content, section_name, new_data):
-    """Update a specific section in README"""
-    start_marker = f"<!-- AUTO-GENERATED:{section_name}:START -->"
-    end_marker = f"<!-- AUTO-GENERATED:{section_name}:END -->"
-    
-    # Check if markers exist
-    if start_marker not in content:
-        log(f"Warning: Start marker for {section_name} not found")
-        return content
-    
-    if end_marker not in content:
-        log(f"Warning: End marker for {section_name} not found")
-        return content
-    
-    # Find positions
-    start_pos = content.index(start_marker) + len(start_marker)
-    end_pos = content.index(end_marker)
-    
-    # Replace content between markers
-    new_content = (
-        content[:start_pos] + 
-        "\n" + new_data + "\n" + 
-        content[end_pos:]
-    )
-    
-    return new_content
+def strip_timestamps(content):
+    """Blank out the badge and footer timestamps, which change on every run"""
+    return _TIMESTAMPS_RE.sub('', content)
+
+def update_readme_section(content, sections):
+    """Update the given sections in README in a single pass
+    
+    `sections` maps section names to their new content.
+    """
+    # Locate the first START and END marker of every section in one scan
+    starts = {}
+    ends = {}
+    for match in _MARKER_RE.finditer(content):
+        name, kind = match.groups()
+        if kind == 'START':
+            starts.setdefault(name, match.end())
+        else:
+            ends.setdefault(name, match.start())
+    
+    spans = []
+    for section_name, new_data in sections.items():
+        # Check if markers exist
+        if section_name not in starts:
+            log(f"Warning: Start marker for {section_name} not found")
+            continue
+        
+        if section_name not in ends or ends[section_name] < starts[section_name]:
+            log(f"Warning: End marker for {section_name} not found")
+            continue
+        
+        spans.append((starts[section_name], ends[section_name], new_data))
+    
+    # Replace content between markers, splicing all sections at once
+    parts = []
+    cursor = 0
+    for start_pos, end_pos, new_data in sorted(spans, key=lambda span: span[0]):
+        if start_pos < cursor:
+            continue  # Overlapping markers; keep the earlier section
+        parts.extend((content[cursor:start_pos], "\n", new_data, "\n"))
+        cursor = end_pos
+    parts.append(content[cursor:])
+    
+    return ''.join(parts)
 
-def prepare_readme_with_markers():
-    """Ensure README has necessary markers"""
-    if not os.path.exists(README_PATH):
+def prepare_readme_with_markers(content):
+    """Ensure README has necessary markers
+    
+    `content` is the current README text, or None if there is no README yet.
+    """
+    if content is None:
         log("README.md not found, creating new one")
         content = """# 🤖 PROJECT_actions
 
@@ -249,42 +320,48 @@ def prepare_readme_with_markers():
             f.write(content)
         return content
     
-    with open(README_PATH, 'r') as f:
-        content = f.read()
-    
     # Check if markers exist, add them if not
-    markers_to_add = []
-    
-    if "<!-- AUTO-GENERATED:BADGES:START -->" not in content:
-        markers_to_add.append(("BADGES", "## 🎯 Purpose"))
-    
-    if "<!-- AUTO-GENERATED:STATUS:START -->" not in content:
-        markers_to_add.append(("STATUS", "## 🚀 Active Workflows"))
-    
-    if "<!-- AUTO-GENERATED:METRICS:START -->" not in content:
-        markers_to_add.append(("METRICS", "## 📊 Monitoring Dashboard"))
+    present = {m.group(1) for m in _MARKER_RE.finditer(content) if m.group(2) == 'START'}
+    markers_to_add = [(name, search_text) for name, search_text in MARKER_ANCHORS
+                      if name not in present]
     
-    if "<!-- AUTO-GENERATED:ACTIVITY:START -->" not in content:
-        markers_to_add.append(("ACTIVITY", "## 🔄 Workflow Status"))
-    
-    # Add missing markers
+    # Locate every insertion point in the original content first
+    insertions = []
     for marker_name, search_text in markers_to_add:
-        if search_text in content:
+        pos = content.find(search_text)
+        if pos != -1:
             # Add before the section
-            pos = content.index(search_text)
             marker_block = f"\n<!-- AUTO-GENERATED:{marker_name}:START -->\n<!-- AUTO-GENERATED:{marker_name}:END -->\n\n"
-            content = content[:pos] + marker_block + content[pos:]
+            insertions.append((pos, marker_block))
             log(f"Added {marker_name} markers to README")
     
-    return content
+    if not insertions:
+        return content
+    
+    # Splice all marker blocks in with a single join
+    parts = []
+    cursor = 0
+    for pos, marker_block in sorted(insertions, key=lambda item: item[0]):
+        parts.extend((content[cursor:pos], marker_block))
+        cursor = pos
+    parts.append(content[cursor:])
+    
+    return ''.join(parts)
 
 def main():
     """Main README generation function"""
     log("=" * 60)
     log("Starting README Generator")
     
+    # Kept to compare against, so an unchanged README is not rewritten
+    try:
+        with open(README_PATH, 'r') as f:
+            current_content = f.read()
+    except FileNotFoundError:
+        current_content = None
+    
     # Ensure README has markers
-    readme_content = prepare_readme_with_markers()
+    readme_content = prepare_readme_with_markers(current_content)
     
     # Load state files
     workflow_data = load_json_file(WORKFLOW_STATE_FILE)
@@ -297,9 +374,12 @@ def main():
         log("No workflow data found, run workflow_analyzer.py first")
         return 1
     
+    # One timestamp for the whole run, shared by the badge and the footer
+    now = datetime.now()
+    
     # Generate sections
     log("Generating badges...")
-    badges = generate_badges(workflow_data, metrics_data)
+    badges = generate_badges(workflow_data, metrics_data, now=now)
     
     log("Generating workflow table...")
     status_table = generate_workflow_table(workflow_data)
@@ -312,28 +392,35 @@ def main():
     
     # Update README sections
     log("Updating README sections...")
-    readme_content = update_readme_section(readme_content, "BADGES", badges)
-    readme_content = update_readme_section(readme_content, "STATUS", status_table)
-    readme_content = update_readme_section(readme_content, "METRICS", metrics)
-    readme_content = update_readme_section(readme_content, "ACTIVITY", activity)
+    readme_content = update_readme_section(readme_content, {
+        "BADGES": badges,
+        "STATUS": status_table,
+        "METRICS": metrics,
+        "ACTIVITY": activity
+    })
     
     # Add footer timestamp
-    footer = f"\n---\n\n*Last automated update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}*"
-    if "*Last automated update:" in readme_content:
-        # Replace existing footer
-        readme_content = re.sub(
-            r'\*Last automated update:.*?\*',
-            f"*Last automated update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}*",
-            readme_content
-        )
+    footer = f"*Last automated update: {now.strftime('%Y-%m-%d %H:%M:%S UTC')}*"
+    footer_start = readme_content.rfind("*Last automated update:")
+    if footer_start != -1:
+        # Replace existing footer, up to its closing '*'
+        footer_end = readme_content.find('*', footer_start + 1)
+        footer_end = footer_end + 1 if footer_end != -1 else len(readme_content)
+        readme_content = readme_content[:footer_start] + footer + readme_content[footer_end:]
     else:
         # Add footer
-        readme_content += footer
+        readme_content += "\n---\n\n" + footer
+    
+    # Skip the write (and the downstream commit) when only timestamps would change
+    if (not force_update and current_content is not None
+            and strip_timestamps(readme_content) == strip_timestamps(current_content)):
+        log("No change in README content, left as is")
+        log("=" * 60)
+        return 0
     
     # Write updated README
     log("Writing updated README...")
-    with open(README_PATH, 'w') as f:
-        f.write(readme_content)
+    write_file_atomic(README_PATH, readme_content.encode('utf-8'))
     
     log("README successfully updated!")
     log("=" * 60)
@@ -6,66 +6,104 @@ Manages log files to prevent unlimited growth and preserves history
 
 import os
 import gzip
+import heapq
 import shutil
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
 
 # Configuration
 SCRIPT_DIR = Path(__file__).parent
 LOG_DIR = SCRIPT_DIR
 ARCHIVE_DIR = SCRIPT_DIR / "monitor_logs_archive"
 
-# Log files to manage
+# gzip level 3 compresses log text nearly as well as 9 for far less CPU
+COMPRESS_LEVEL = 3
+COPY_BUFFER_SIZE = 1 << 20
+BYTES_PER_MB = 1024 * 1024
+
+# Log files to manage; sizes are compared in bytes, max_size_mb is for reports
 LOG_FILES = {
     ".project_monitor.log": {
         "max_size_mb": 10,
+        "max_size_bytes": 10 * BYTES_PER_MB,
         "keep_days": 30,
         "compress": True
     },
     ".project_monitor_stdout.log": {
         "max_size_mb": 5,
+        "max_size_bytes": 5 * BYTES_PER_MB,
         "keep_days": 7,
         "compress": True
     },
     ".project_monitor_stderr.log": {
         "max_size_mb": 5,
+        "max_size_bytes": 5 * BYTES_PER_MB,
         "keep_days": 7,
         "compress": True
     }
 }
 
-def get_file_size_mb(filepath):
-    """Get file size in MB."""
-    if not filepath.exists():
-        return 0
-    return filepath.stat().st_size / (1024 * 1024)
+def get_file_size(filepath):
+    """Get file size in bytes; raises FileNotFoundError if the file is missing."""
+    return filepath.stat().st_size
+
+def write_file_atomic(path, data):
+    """Write bytes to path via a temp file and rename, so readers never see a partial file"""
+    path = os.fspath(path)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 def compress_file(filepath, archive_path):
     """Compress a file using gzip."""
     with open(filepath, 'rb') as f_in:
-        with gzip.open(archive_path, 'wb') as f_out:
-            shutil.copyfileobj(f_in, f_out)
+        with gzip.open(archive_path, 'wb', compresslevel=COMPRESS_LEVEL) as f_out:
+            shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
     print(f"Compressed {filepath.name} to {archive_path.name}")
 
-def rotate_log(log_file, config):
+def rotate_log(log_file, config, now):
     """Rotate a single log file if needed."""
     log_path = LOG_DIR / log_file
     
-    if not log_path.exists():
+    try:
+        size = get_file_size(log_path)
+    except FileNotFoundError:
         return
     
-    size_mb = get_file_size_mb(log_path)
-    
     # Check if rotation is needed
-    if size_mb < config["max_size_mb"]:
+    if size < config["max_size_bytes"]:
         return
     
     # Create archive directory if needed
     ARCHIVE_DIR.mkdir(exist_ok=True)
     
     # Generate archive filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     archive_name = f"{log_file}.{timestamp}"
     
     if config["compress"]:
@@ -77,41 +115,40 @@ def rotate_log(log_file, config):
     
     # Clear the original log file
     with open(log_path, 'w') as f:
-        f.write(f"[Log rotated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}]\n")
+        f.write(f"[Log rotated at {now.strftime('%Y-%m-%d %H:%M:%S')}]\n")
     
-    print(f"Rotated {log_file} ({size_mb:.2f}MB) to {archive_path.name}")
+    print(f"Rotated {log_file} ({size / BYTES_PER_MB:.2f}MB) to {archive_path.name}")
 
-def clean_old_archives():
+def clean_old_archives(now):
     """Remove archives older than retention period."""
-    if not ARCHIVE_DIR.exists():
+    try:
+        archives = os.scandir(ARCHIVE_DIR)
+    except FileNotFoundError:
         return
     
-    now = datetime.now()
-    
-    for archive_file in ARCHIVE_DIR.iterdir():
-        # Extract original log name from archive
-        original_name = archive_file.name.split('.')[0] + '.' + archive_file.name.split('.')[1]
-        
-        # Find config for this log type
-        config = None
-        for log_name, log_config in LOG_FILES.items():
-            if archive_file.name.startswith(log_name):
-                config = log_config
-                break
-        
-        if not config:
-            continue
-        
-        # Check age
-        file_age = now - datetime.fromtimestamp(archive_file.stat().st_mtime)
-        if file_age.days > config["keep_days"]:
-            archive_file.unlink()
-            print(f"Deleted old archive: {archive_file.name} ({file_age.days} days old)")
+    # Match longest log names first so no name shadows a longer one it prefixes
+    log_names = sorted(LOG_FILES, key=len, reverse=True)
+    
+    with archives as it:
+        for archive_file in it:
+            # Find config for this log type
+            config = next((LOG_FILES[n] for n in log_names if archive_file.name.startswith(n)), None)
+            
+            if not config:
+                continue
+            
+            # Check age
+            file_age = now - datetime.fromtimestamp(archive_file.stat().st_mtime)
+            if file_age.days > config["keep_days"]:
+                os.unlink(archive_file.path)
+                print(f"Deleted old archive: {archive_file.name} ({file_age.days} days old)")
 
 def generate_summary():
     """Generate a summary of log status."""
+    # Taken after rotation so archives written this run are not dated in the future
+    now = datetime.now()
     summary = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
         "logs": {},
         "archives": {
             "count": 0,
@@ -121,30 +158,36 @@ def generate_summary():
     
     # Check current logs
     for log_file, config in LOG_FILES.items():
-        log_path = LOG_DIR / log_file
-        if log_path.exists():
-            size_mb = get_file_size_mb(log_path)
-            summary["logs"][log_file] = {
-                "size_mb": round(size_mb, 2),
-                "max_size_mb": config["max_size_mb"],
-                "needs_rotation": size_mb >= config["max_size_mb"]
-            }
+        try:
+            size = get_file_size(LOG_DIR / log_file)
+        except FileNotFoundError:
+            continue
+        summary["logs"][log_file] = {
+            "size_mb": round(size / BYTES_PER_MB, 2),
+            "max_size_mb": config["max_size_mb"],
+            "needs_rotation": size >= config["max_size_bytes"]
+        }
     
     # Check archives
-    if ARCHIVE_DIR.exists():
-        archives = list(ARCHIVE_DIR.iterdir())
+    try:
+        # DirEntry caches its stat result, so each archive is stat()ed once
+        with os.scandir(ARCHIVE_DIR) as it:
+            archives = list(it)
+    except FileNotFoundError:
+        pass
+    else:
         summary["archives"]["count"] = len(archives)
         summary["archives"]["total_size_mb"] = round(
-            sum(f.stat().st_size for f in archives) / (1024 * 1024), 2
+            sum(f.stat().st_size for f in archives) / BYTES_PER_MB, 2
         )
         
         # List recent archives
         summary["archives"]["recent"] = []
-        for archive in sorted(archives, key=lambda x: x.stat().st_mtime, reverse=True)[:5]:
+        for archive in heapq.nlargest(5, archives, key=lambda x: x.stat().st_mtime):
             summary["archives"]["recent"].append({
                 "name": archive.name,
-                "size_mb": round(archive.stat().st_size / (1024 * 1024), 2),
-                "age_days": (datetime.now() - datetime.fromtimestamp(archive.stat().st_mtime)).days
+                "size_mb": round(archive.stat().st_size / BYTES_PER_MB, 2),
+                "age_days": (now - datetime.fromtimestamp(archive.stat().st_mtime)).days
             })
     
     return summary
@@ -154,8 +197,7 @@ def save_rotation_report():
     report_path = LOG_DIR / "log_rotation_report.json"
     summary = generate_summary()
     
-    with open(report_path, 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_file_atomic(report_path, _dumps(summary))
     
     print(f"\nLog Rotation Summary saved to: {report_path}")
     print(f"Current logs: {len(summary['logs'])}")
@@ -164,16 +206,19 @@ def save_rotation_report():
 
 def main():
     """Main rotation process."""
+    # One timestamp for rotation: archive names, rotation headers and ages
+    now = datetime.now()
+    
     print("=" * 60)
-    print(f"Log Rotation Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Log Rotation Started: {now.strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
     # Rotate logs if needed
     for log_file, config in LOG_FILES.items():
-        rotate_log(log_file, config)
+        rotate_log(log_file, config, now)
     
     # Clean old archives
-    clean_old_archives()
+    clean_old_archives(now)
     
     # Generate and save report
     save_rotation_report()
@@ -4,60 +4,121 @@ Workflow Analyzer - Analyzes GitHub Actions workflow states
 """
 
 import os
+import sys
 import json
 import re
 try:
     import yaml
+    try:
+        # libyaml-backed loader, much faster than the pure-Python one
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
 except ImportError:
     # Will be installed by GitHub Actions
     yaml = None
-from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    
+    _loads = json.loads
 
 # Configuration
 WORKFLOW_DIR = ".github/workflows"
 STATE_FILE = ".workflow_state.json"
 SUMMARY_FILE = ".workflow_summary.txt"
+CACHE_FILE = ".workflow_analyze_cache.json"
+
+# Bump when analyze_workflow_file output changes to invalidate cached results
+CACHE_VERSION = 2
+WORKFLOW_SUFFIXES = ('.yml', '.yml.disabled')
+
+# Bytes read up front; name and triggers almost always fit in this head
+HEAD_READ_SIZE = 4096
+
+# Precompiled fallback patterns for when YAML parsing is unavailable
+_NAME_RE = re.compile(r'^name:\s*(.+)$', re.MULTILINE)
+_CRON_RE = re.compile(r'cron:\s*[\'"]([^\'"]+)[\'"]')
+
+# Start of a top-level YAML key line
+_TOP_LEVEL_RE = re.compile(rb'\n(?=[A-Za-z_"\'])')
+
+# Common cron patterns, built once; interned so workflows sharing a schedule share the string
+_CRON_PATTERNS = {cron: sys.intern(text) for cron, text in {
+    '0 * * * *': 'Hourly',
+    '15 * * * *': 'Hourly at :15',
+    '0 */2 * * *': 'Every 2 hours',
+    '0 */4 * * *': 'Every 4 hours',
+    '0 */6 * * *': 'Every 6 hours',
+    '0 0 * * *': 'Daily at midnight',
+    '0 9 * * *': 'Daily at 9 AM',
+    '0 0 * * 0': 'Weekly on Sunday',
+    '0 0 1 * *': 'Monthly on 1st',
+}.items()}
 
 def log(message):
     """Print timestamped log message"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def extract_workflow_name(content):
-    """Extract workflow name from YAML content"""
+def parse_workflow(content):
+    """Parse workflow YAML content, returning None if unavailable or invalid"""
     if yaml:
         try:
-            # Try to parse as YAML
-            data = yaml.safe_load(content)
-            if data and 'name' in data:
-                return data['name']
+            return yaml.load(content, Loader=SafeLoader)
         except:
             pass
+    return None
+
+def get_triggers_section(data):
+    """Get the parsed `on:` section of a workflow as a dict keyed by trigger"""
+    if not isinstance(data, dict):
+        return None
+    # YAML 1.1 loads a bare `on` key as the boolean True
+    on_section = data.get('on', data.get(True))
+    if isinstance(on_section, dict):
+        return on_section
+    if isinstance(on_section, str):
+        return {on_section: None}
+    if isinstance(on_section, list):
+        return {trigger: None for trigger in on_section if isinstance(trigger, str)}
+    return None
+
+def extract_workflow_name(data, content):
+    """Extract workflow name from parsed YAML, falling back to raw content"""
+    if isinstance(data, dict) and data.get('name'):
+        return data['name']
     # Fallback to regex
-    match = re.search(r'^name:\s*(.+)$', content, re.MULTILINE)
+    match = _NAME_RE.search(content)
     if match:
         return match.group(1).strip().strip('"\'')
     return None
 
-def extract_schedule(content):
-    """Extract schedule from workflow content"""
-    if yaml:
-        try:
-            data = yaml.safe_load(content)
-            if data and 'on' in data:
-                on_section = data['on']
-                if isinstance(on_section, dict) and 'schedule' in on_section:
-                    schedule = on_section['schedule']
-                    if isinstance(schedule, list) and len(schedule) > 0:
-                        cron = schedule[0].get('cron', '')
-                        # Parse cron expression to human-readable
-                        return parse_cron_to_human(cron)
-        except:
-            pass
+def extract_schedule(data, content):
+    """Extract schedule from parsed YAML, falling back to raw content"""
+    if isinstance(data, dict):
+        # Parsed YAML is authoritative; content may be only the file's head,
+        # so scanning it would make the result depend on file size
+        on_section = get_triggers_section(data)
+        if on_section and 'schedule' in on_section:
+            schedule = on_section['schedule']
+            if isinstance(schedule, list) and schedule and isinstance(schedule[0], dict):
+                # Parse cron expression to human-readable
+                return parse_cron_to_human(schedule[0].get('cron', ''))
+        return "Manual only"
     
-    # Fallback to regex
-    match = re.search(r'cron:\s*[\'"]([^\'"]+)[\'"]', content)
+    # Fallback to regex when YAML is unavailable or the file did not parse
+    match = _CRON_RE.search(content)
     if match:
         return parse_cron_to_human(match.group(1))
     
@@ -65,29 +126,35 @@ def extract_schedule(content):
 
 def parse_cron_to_human(cron):
     """Convert cron expression to human-readable format"""
-    if not cron:
-        return "Manual only"
-    
-    # Common patterns
-    patterns = {
-        '0 * * * *': 'Hourly',
-        '15 * * * *': 'Hourly at :15',
-        '0 */2 * * *': 'Every 2 hours',
-        '0 */4 * * *': 'Every 4 hours',
-        '0 */6 * * *': 'Every 6 hours',
-        '0 0 * * *': 'Daily at midnight',
-        '0 9 * * *': 'Daily at 9 AM',
-        '0 0 * * 0': 'Weekly on Sunday',
-        '0 0 1 * *': 'Monthly on 1st',
-    }
+    # Return raw cron if no pattern matches
+    return _CRON_PATTERNS.get(cron) or (f"Cron: {cron}" if cron else "Manual only")
+
+def read_workflow(filepath, size):
+    """Read and parse a workflow file, trying only its head for large files
     
-    if cron in patterns:
-        return patterns[cron]
+    Returns a (content, data) tuple; data is None if YAML is unavailable.
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(HEAD_READ_SIZE)
+        
+        if yaml and size > HEAD_READ_SIZE:
+            # Cut before the last top-level key so every entry kept is complete
+            cut = None
+            for cut in _TOP_LEVEL_RE.finditer(head):
+                pass
+            if cut:
+                content = head[:cut.start() + 1].decode()
+                data = parse_workflow(content)
+                if (isinstance(data, dict) and data.get('name')
+                        and get_triggers_section(data) is not None):
+                    return content, data
+        
+        raw = head + f.read()
     
-    # Return raw cron if no pattern matches
-    return f"Cron: {cron}"
+    content = raw.decode()
+    return content, parse_workflow(content)
 
-def analyze_workflow_file(filepath):
+def analyze_workflow_file(filepath, stat=None):
     """Analyze a single workflow file"""
     filename = os.path.basename(filepath)
     
@@ -95,26 +162,34 @@ def analyze_workflow_file(filepath):
     enabled = filename.endswith('.yml')
     actual_filename = filename.replace('.disabled', '') if filename.endswith('.disabled') else filename
     
-    # Read file content
+    # Read and parse once, sharing the result between extractors
     try:
-        with open(filepath, 'r') as f:
-            content = f.read()
+        if stat is None:
+            stat = os.stat(filepath)
+        content, data = read_workflow(filepath, stat.st_size)
     except Exception as e:
         log(f"Error reading {filepath}: {e}")
         return None
     
     # Extract information
-    name = extract_workflow_name(content)
+    name = extract_workflow_name(data, content)
     if not name:
         # Use filename as fallback
         name = actual_filename.replace('.yml', '').replace('-', ' ').title()
     
-    schedule = extract_schedule(content)
+    schedule = extract_schedule(data, content)
     
     # Check for various triggers
-    has_push = 'push:' in content
-    has_pull_request = 'pull_request:' in content
-    has_workflow_dispatch = 'workflow_dispatch:' in content
+    on_section = get_triggers_section(data)
+    if on_section is not None:
+        has_push = 'push' in on_section
+        has_pull_request = 'pull_request' in on_section
+        has_workflow_dispatch = 'workflow_dispatch' in on_section
+    else:
+        # Fallback to substring checks
+        has_push = 'push:' in content
+        has_pull_request = 'pull_request:' in content
+        has_workflow_dispatch = 'workflow_dispatch:' in content
     has_schedule = schedule != "Manual only"
     
     triggers = []
@@ -135,30 +210,78 @@ def analyze_workflow_file(filepath):
         'triggers': triggers,
         'has_schedule': has_schedule,
         'has_manual': has_workflow_dispatch,
-        'file_size': os.path.getsize(filepath),
-        'last_modified': os.path.getmtime(filepath)
+        'file_size': stat.st_size,
+        'last_modified': stat.st_mtime
     }
 
+def load_analysis_cache():
+    """Load cached per-file analysis results from previous runs"""
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cache = _loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    # A malformed cache is just a cache miss, never a failed run
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    files = cache.get('files')
+    return files if isinstance(files, dict) else {}
+
+def save_analysis_cache(files):
+    """Save per-file analysis results for the next run"""
+    try:
+        with open(CACHE_FILE, 'wb') as f:
+            f.write(_dumps({'version': CACHE_VERSION, 'files': files}))
+    except OSError as e:
+        log(f"Error saving analysis cache: {e}")
+
 def analyze_all_workflows():
     """Analyze all workflows in the directory"""
-    workflow_path = Path(WORKFLOW_DIR)
-    
-    if not workflow_path.exists():
+    try:
+        it = os.scandir(WORKFLOW_DIR)
+    except FileNotFoundError:
         log(f"Workflow directory {WORKFLOW_DIR} not found")
         return []
     
+    # Find all .yml and .yml.disabled files
+    with it:
+        entries = [
+            entry for entry in it
+            if not entry.name.startswith('.') and entry.name.endswith(WORKFLOW_SUFFIXES)
+        ]
+    
+    # Reuse results for files whose mtime and size are unchanged since last run
+    cache = load_analysis_cache()
+    new_cache = {}
     workflows = []
+    stale = []
+    for entry in entries:
+        stat = entry.stat()
+        cached = cache.get(entry.name)
+        if (isinstance(cached, dict) and cached.get('info')
+                and cached.get('mtime_ns') == stat.st_mtime_ns
+                and cached.get('size') == stat.st_size):
+            new_cache[entry.name] = cached
+            workflows.append(cached['info'])
+        else:
+            log(f"Analyzing {entry.name}...")
+            stale.append(entry)
     
-    # Find all .yml and .yml.disabled files
-    for file in workflow_path.glob('*.yml*'):
-        if file.name.startswith('.'):
-            continue  # Skip hidden files
-        
-        log(f"Analyzing {file.name}...")
-        workflow_info = analyze_workflow_file(str(file))
-        
-        if workflow_info:
-            workflows.append(workflow_info)
+    # Each file is an independent read + parse, so analyze them concurrently
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            results = executor.map(lambda entry: analyze_workflow_file(entry.path, entry.stat()), stale)
+            for entry, workflow_info in zip(stale, results):
+                if workflow_info:
+                    workflows.append(workflow_info)
+                    new_cache[entry.name] = {
+                        'mtime_ns': entry.stat().st_mtime_ns,
+                        'size': entry.stat().st_size,
+                        'info': workflow_info
+                    }
+    
+    log(f"Reused cached analysis for {len(entries) - len(stale)} of {len(entries)} workflows")
+    save_analysis_cache(new_cache)
     
     # Sort by enabled status, then by name
     workflows.sort(key=lambda x: (not x['enabled'], x['name']))
@@ -211,8 +334,8 @@ def main():
     # Save state file
     log(f"Saving state to {STATE_FILE}...")
     try:
-        with open(STATE_FILE, 'w') as f:
-            json.dump(state_data, f, indent=2)
+        with open(STATE_FILE, 'wb') as f:
+            f.write(_dumps(state_data))
         log("State file saved successfully")
     except Exception as e:
         log(f"Error saving state file: {e}")